@@ -1,58 +1,33 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.quantum_info import Operator
-from scipy.linalg import expm
 
-PAYOFFS = {
-    '00': (3, 3),
-    '01': (5, 0),
-    '10': (0, 5),
-    '11': (1, 1)
-}
-
-I = np.array([[1, 0], [0, 1]])
-D = np.array([[0, 1j], [1j, 0]])
-Q = np.array([[1j, 0], [0, -1j]])
-
-def get_strategy_operator(label):
-    if 'Cooperate' in label: return Operator(I)
-    if 'Defect' in label: return Operator(D)
-    if 'Quantum' in label: return Operator(Q)
-    return Operator(I)
-
-def get_J_gate(gamma):
-    X = np.array([[0, 1], [1, 0]])
-    XX = np.kron(X, X)
-    J_matrix = expm(1j * gamma * XX / 2)
-    return Operator(J_matrix)
+from ewl_core import (
+    build_circuit,
+    expected_payoffs,
+    run_batch,
+    run_circuit,
+    sample_counts,
+    sweep_payoffs,
+)
 
-def run_circuit(strat_A, strat_B, gamma, shots):
-    qc = QuantumCircuit(2, 2)
-    qc.append(get_J_gate(gamma), [0, 1])
-    qc.barrier()
-    qc.append(get_strategy_operator(strat_A), [0])
-    qc.append(get_strategy_operator(strat_B), [1])
-    qc.barrier()
-    qc.append(get_J_gate(gamma).adjoint(), [0, 1])
-    qc.measure([0, 1], [0, 1])
-    
-    sim = AerSimulator()
-    job = sim.run(transpile(qc, sim), shots=shots)
-    return job.result().get_counts(), qc
+@st.cache_data(max_entries=128, show_spinner=False)
+def simulate(strat_A, strat_B, gamma, shots, use_aer):
+    # Counts and payoffs are cached together, so a repeated matchup skips both
+    if use_aer:
+        counts = run_circuit(strat_A, strat_B, gamma, shots)
+    else:
+        counts = sample_counts(strat_A, strat_B, gamma, shots)
+    return counts, expected_payoffs(counts, shots)
 
-def calculate_expected_payoff(counts, shots):
-    alice_score = 0
-    bob_score = 0
-    for outcome, count in counts.items():
-        # Qiskit Key is 'BobAlice' (q1q0)
-        key = outcome[0] + outcome[1] 
-        p_alice, p_bob = PAYOFFS[key]
-        alice_score += p_alice * count
-        bob_score += p_bob * count
-    return alice_score/shots, bob_score/shots
+@st.cache_resource(max_entries=32)
+def _draw_qc(strat_a, strat_b, gamma):
+    fig, ax = plt.subplots()
+    build_circuit(strat_a, strat_b, gamma).draw(output='mpl', ax=ax)
+    # Drop pyplot's reference so reruns don't accumulate open figures
+    plt.close(fig)
+    return fig
 
 st.set_page_config(page_title="Quantum Prisoner's Dilemma", layout="wide")
 
@@ -61,8 +36,8 @@ st.title("Quantum Prisoner's Dilemma")
 # Initialize Session State to hold results
 if 'counts' not in st.session_state:
     st.session_state['counts'] = None
-if 'qc' not in st.session_state:
-    st.session_state['qc'] = None
+if 'matchup' not in st.session_state:
+    st.session_state['matchup'] = None
 if 'payoffs' not in st.session_state:
     st.session_state['payoffs'] = (0, 0)
 
@@ -74,9 +49,15 @@ gamma_input = st.sidebar.slider(
     help="0 = Classical, 1.57 = Max Quantum"
 )
 st.sidebar.subheader("Strategies")
-strat_alice = st.sidebar.selectbox("Alice", ['Cooperate (C)', 'Defect (D)', 'Quantum (Q)'], index=1)
-strat_bob = st.sidebar.selectbox("Bob", ['Cooperate (C)', 'Defect (D)', 'Quantum (Q)'], index=1)
+# Widgets return the strategy key; the full name is only for display
+STRATEGY_NAMES = {'C': 'Cooperate (C)', 'D': 'Defect (D)', 'Q': 'Quantum (Q)'}
+strat_alice = st.sidebar.selectbox("Alice", list(STRATEGY_NAMES), index=1, format_func=STRATEGY_NAMES.get)
+strat_bob = st.sidebar.selectbox("Bob", list(STRATEGY_NAMES), index=1, format_func=STRATEGY_NAMES.get)
 shots = st.sidebar.number_input("Shots", value=4096)
+use_aer = st.sidebar.checkbox(
+    "Exact simulator (Aer)", 
+    help="Run the circuit on Qiskit Aer instead of sampling the exact outcome distribution"
+)
 
 # --- TABS ---
 tab1, tab2 = st.tabs(["Simulation", "Visual"])
@@ -84,14 +65,13 @@ tab1, tab2 = st.tabs(["Simulation", "Visual"])
 with tab1:
     col1, col2 = st.columns([1, 1])
     with col1:
-        st.info(f"**Matchup:** {strat_alice} vs {strat_bob}")
+        st.info(f"**Matchup:** {STRATEGY_NAMES[strat_alice]} vs {STRATEGY_NAMES[strat_bob]}")
         
         if st.button("Run Simulation", type="primary"):
             # Run and save to session state
-            c, q = run_circuit(strat_alice, strat_bob, gamma_input, shots)
-            p_a, p_b = calculate_expected_payoff(c, shots)
+            c, (p_a, p_b) = simulate(strat_alice, strat_bob, gamma_input, shots, use_aer)
             st.session_state['counts'] = c
-            st.session_state['qc'] = q
+            st.session_state['matchup'] = (strat_alice, strat_bob, gamma_input)
             st.session_state['payoffs'] = (p_a, p_b)
 
         # Display Results if they exist
@@ -110,10 +90,8 @@ with tab1:
     with col2:
         st.subheader("Quantum Circuit")
         # Only draw if a circuit exists
-        if st.session_state['qc'] is not None:
-            fig, ax = plt.subplots()
-            st.session_state['qc'].draw(output='mpl', ax=ax)
-            st.pyplot(fig)
+        if st.session_state['matchup'] is not None:
+            st.pyplot(_draw_qc(*st.session_state['matchup']))
         else:
             st.write("Run the simulation to generate the circuit.")
 
@@ -122,27 +100,19 @@ with tab2:
     if st.button("Generate Entanglement Plot"):
         with st.spinner("Simulating full sweep..."):
             gammas = np.linspace(0, 1.57, 20)
-            payoffs_d, payoffs_q = [], []
-            
-            # Progress bar
-            bar = st.progress(0)
-            for idx, g in enumerate(gammas):
-                # D vs D
-                c1, _ = run_circuit('Defect', 'Defect', g, 1024)
-                p1, _ = calculate_expected_payoff(c1, 1024)
-                payoffs_d.append(p1)
-                
-                # Q vs D
-                c2, _ = run_circuit('Quantum', 'Defect', g, 1024)
-                p2, _ = calculate_expected_payoff(c2, 1024)
-                payoffs_q.append(p2)
-                bar.progress((idx+1)/20)
+            if use_aer:
+                # Interleaved D vs D / Q vs D circuits, submitted to Aer as one batch
+                matchups = [(s, 'D', g) for g in gammas for s in ('D', 'Q')]
+                payoffs = [expected_payoffs(c, 1024)[0] for c in run_batch(matchups, 1024)]
+                payoffs_d, payoffs_q = payoffs[0::2], payoffs[1::2]
+            else:
+                # Exact payoffs for the whole grid, no Aer needed for the sweep
+                payoffs_d = sweep_payoffs('D', 'D', gammas)
+                payoffs_q = sweep_payoffs('Q', 'D', gammas)
                 
-            fig2, ax2 = plt.subplots()
-            ax2.plot(gammas, payoffs_d, 'r--', label='Classical (D vs D)')
-            ax2.plot(gammas, payoffs_q, 'b-', linewidth=2, label='Quantum (Q vs D)')
-            ax2.set_xlabel("Entanglement")
-            ax2.set_ylabel("Alice's Payoff")
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-            st.pyplot(fig2)
+            # Rendered client-side, so no matplotlib figure per rerun
+            df = pd.DataFrame(
+                {'Classical (D vs D)': payoffs_d, 'Quantum (Q vs D)': payoffs_q},
+                index=gammas
+            )
+            st.line_chart(df, x_label="Entanglement", y_label="Alice's Payoff")
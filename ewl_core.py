@@ -0,0 +1,175 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit.quantum_info import Operator
+
+# (Alice, Bob) payoffs, keyed by Qiskit outcome 'BobAlice' (q1q0)
+PAYOFFS = {
+    '00': (3, 3),
+    '01': (5, 0),
+    '10': (0, 5),
+    '11': (1, 1)
+}
+
+# Fixed outcome order: index i is the Qiskit key format(i, '02b')
+OUTCOMES = ('00', '01', '10', '11')
+_OUTCOME_INDEX = {key: i for i, key in enumerate(OUTCOMES)}
+PAYOFF_A = np.array([PAYOFFS[key][0] for key in OUTCOMES])
+PAYOFF_B = np.array([PAYOFFS[key][1] for key in OUTCOMES])
+
+I = np.array([[1, 0],
+              [0, 1]])
+
+D = np.array([[0, 1j],
+              [1j, 0]])
+
+Q = np.array([[1j, 0],
+              [0, -1j]])
+
+X = np.array([[0, 1],
+              [1, 0]])
+
+XX = np.kron(X, X)
+I4 = np.eye(4)
+
+# Strategies are keyed 'C', 'D', 'Q'; anything else is rejected rather than guessed
+_STRAT_MAT = {'C': I, 'D': D, 'Q': Q}
+_STRAT_OP = {key: Operator(mat) for key, mat in _STRAT_MAT.items()}
+
+# Qiskit is little-endian: Alice acts on qubit 0, so her gate is the right-hand factor
+_KRON = {(a, b): np.kron(_STRAT_MAT[b], _STRAT_MAT[a]) for a in _STRAT_MAT for b in _STRAT_MAT}
+
+def _strategy_key(label):
+    if label not in _STRAT_MAT: raise ValueError(f"Unknown strategy: {label}")
+    return label
+
+def get_strategy_operator(label):
+    return _STRAT_OP[_strategy_key(label)]
+
+def get_pair_matrix(strat_A, strat_B):
+    return _KRON[_strategy_key(strat_A), _strategy_key(strat_B)]
+
+def _J_matrix(gamma):
+    # XX squares to the identity, so exp(i*gamma*XX/2) = cos(gamma/2) I + i sin(gamma/2) XX
+    c, s = math.cos(gamma / 2), math.sin(gamma / 2)
+    return c * I4 + 1j * s * XX
+
+@lru_cache(maxsize=64)
+def _J_pair(gamma_key):
+    # One matrix build; the adjoint is just its conjugate transpose
+    J_matrix = _J_matrix(gamma_key)
+    return Operator(J_matrix), Operator(J_matrix.conj().T)
+
+def get_J_pair(gamma):
+    return _J_pair(round(gamma, 10))
+
+# --- ANALYTIC KERNEL ---
+
+def analytic_probs(strat_A, strat_B, gamma):
+
+    J = _J_matrix(gamma)
+    M = J.conj().T @ get_pair_matrix(strat_A, strat_B) @ J
+
+    # Amplitudes of J^dag (U_B x U_A) J |00>, ordered as OUTCOMES
+    return np.abs(M[:, 0]) ** 2
+
+# For every C/D/Q pair the outcome distribution interpolates between the separable and the
+# maximally entangled game: P(gamma) = cos^2(gamma) P(0) + sin^2(gamma) P(pi/2) (derived
+# symbolically). Two endpoint distributions per pair therefore cover any gamma.
+_PROB_ENDPOINTS = {
+    pair: np.stack([analytic_probs(*pair, 0.0), analytic_probs(*pair, np.pi / 2)])
+    for pair in _KRON
+}
+
+def _endpoints(strat_A, strat_B):
+    return _PROB_ENDPOINTS[_strategy_key(strat_A), _strategy_key(strat_B)]
+
+def analytic_probs_batch(strat_A, strat_B, gammas):
+
+    # Real trig only, shape (G, 4); no J or matrix products per gamma
+    cos2 = np.cos(np.asarray(gammas, dtype=float)) ** 2
+    weights = np.stack([cos2, 1 - cos2], axis=-1)
+    return weights @ _endpoints(strat_A, strat_B)
+
+def analytic_probs_table(gamma, strategies=('C', 'D', 'Q')):
+
+    # Every U_B x U_A at once, shape (A, B, 4, 4)
+    kron_grid = np.array([[get_pair_matrix(a, b) for b in strategies] for a in strategies])
+
+    J = _J_matrix(gamma)
+    amps = np.einsum('ij,abjk,k->abi', J.conj().T, kron_grid, J[:, 0])
+    return np.abs(amps) ** 2
+
+def sweep_payoffs(strat_A, strat_B, gammas, payoff_vec=PAYOFF_A):
+
+    # Expected payoff per gamma, shape (G,)
+    return analytic_probs_batch(strat_A, strat_B, gammas) @ payoff_vec
+
+# --- SAMPLING ---
+
+_RNG = np.random.default_rng()
+
+def sample_counts(strat_A, strat_B, gamma, shots):
+    # Shot noise drawn straight from the exact distribution instead of running Aer
+    probs = analytic_probs(strat_A, strat_B, gamma)
+    counts = _RNG.multinomial(shots, probs / probs.sum())
+    return {key: int(n) for key, n in zip(OUTCOMES, counts) if n}
+
+def sample_counts_batch(strat_A, strat_B, gammas, shots):
+    # One multinomial draw per gamma, shape (G, 4) in OUTCOMES order
+    probs = analytic_probs_batch(strat_A, strat_B, gammas)
+    return _RNG.multinomial(shots, probs / probs.sum(axis=1, keepdims=True))
+
+def expected_payoffs(probs_or_counts, shots=None):
+    # Probabilities (or a batch of them) as-is; counts, as a Qiskit dict or array, over shots
+    vec = probs_or_counts
+    if isinstance(vec, dict):
+        vec = np.zeros(4)
+        for outcome, count in probs_or_counts.items():
+            vec[_OUTCOME_INDEX[outcome]] = count
+    if shots is not None:
+        vec = np.asarray(vec) / shots
+    return vec @ PAYOFF_A, vec @ PAYOFF_B
+
+# --- AER ---
+
+def build_circuit(strat_A, strat_B, gamma):
+
+    qc = QuantumCircuit(2, 2)
+
+    J, J_dag = get_J_pair(gamma)
+    qc.append(J, [0, 1])
+    qc.barrier()
+
+    qc.append(get_strategy_operator(strat_A), [0])
+    qc.append(get_strategy_operator(strat_B), [1])
+    qc.barrier()
+
+    qc.append(J_dag, [0, 1])
+
+    qc.measure([0, 1], [0, 1])
+
+    return qc
+
+_SIM = AerSimulator()
+
+# Aer runs the unitary gates natively, so circuits go to it untranspiled
+@lru_cache(maxsize=64)
+def _cached_circuit(strat_A, strat_B, gamma_key):
+    return build_circuit(strat_A, strat_B, gamma_key)
+
+def run_circuit(strat_A, strat_B, gamma, shots):
+    qc = _cached_circuit(strat_A, strat_B, round(gamma, 10))
+    return _SIM.run(qc, shots=shots).result().get_counts()
+
+def run_batch(matchups, shots):
+
+    # One Aer job for a list of (strat_A, strat_B, gamma); counts come back in the same order.
+    # max_parallel_experiments=0 lets Aer spread the batch over all cores
+    circuits = [_cached_circuit(a, b, round(g, 10)) for a, b, g in matchups]
+    result = _SIM.run(circuits, shots=shots, max_parallel_experiments=0).result()
+
+    return [result.get_counts(i) for i in range(len(circuits))]
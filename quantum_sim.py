@@ -1,95 +1,33 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.quantum_info import Operator
-from scipy.linalg import expm
 
-PAYOFFS = {
-    '00': 3,
-    '01': 5,
-    '10': 0,
-    '11': 1
-}
-
-I = np.array([[1, 0], 
-              [0, 1]])
-
-D = np.array([[0, 1j], 
-              [1j, 0]])
-
-Q = np.array([[1j, 0], 
-              [0, -1j]])
-
-def get_strategy_operator(label):
-    if label == 'C': return Operator(I)
-    if label == 'D': return Operator(D)
-    if label == 'Q': return Operator(Q)
-    raise ValueError(f"Unknown strategy: {label}")
-
-def get_J_gate(gamma):
-
-    X = np.array([[0, 1], [1, 0]])
-    XX = np.kron(X, X)
-    
-    # Calculate matrix exponential
-    J_matrix = expm(1j * gamma * XX / 2)
-    return Operator(J_matrix)
-
-def run_ewl_circuit(strat_A, strat_B, gamma, shots=4096):
-
-    qc = QuantumCircuit(2, 2)
-    
-    J = get_J_gate(gamma)
-    qc.append(J, [0, 1])
-    qc.barrier()
-    
-    op_A = get_strategy_operator(strat_A)
-    op_B = get_strategy_operator(strat_B)
-    
-    qc.append(op_A, [0])
-    qc.append(op_B, [1])
-    qc.barrier()
-    
-    J_dag = J.adjoint()
-    qc.append(J_dag, [0, 1])
-    
-    qc.measure([0, 1], [0, 1])
-    
-    sim = AerSimulator()
-    job = sim.run(transpile(qc, sim), shots=shots)
-    counts = job.result().get_counts()
-    
-    return counts
-
-def get_expected_payoff(counts, shots):
-    total_score = 0
-    for outcome, count in counts.items():
-
-        bin_alice = outcome[1]
-        bin_bob = outcome[0]
-
-        key = bin_bob + bin_alice
-
-
-        score = PAYOFFS[key]
-        total_score += score * count
-        
-    return total_score / shots
-
-def experiment_1_entanglement_sweep():
+from ewl_core import (
+    analytic_probs_table,
+    expected_payoffs,
+    run_batch,
+    sample_counts_batch,
+    sweep_payoffs,
+)
+
+def experiment_1_entanglement_sweep(shots=None, use_aer=False):
+    # shots=None plots the exact payoffs; with a shot count the outcomes are
+    # sampled from the exact distribution, or run on Aer when use_aer is set
     print("\nRunning Experiment 1: The Effect of Gamma (RQ1)...")
     gammas = np.linspace(0, np.pi/2, 25)
     
-    payoffs_classical = []
-    payoffs_quantum = []
-    
-    for g in gammas:
-        c_dd = run_ewl_circuit('D', 'D', g)
-        payoffs_classical.append(get_expected_payoff(c_dd, 4096))
-        
-        c_qd = run_ewl_circuit('Q', 'D', g)
-        payoffs_quantum.append(get_expected_payoff(c_qd, 4096))
+    if shots is None:
+        payoffs_classical = sweep_payoffs('D', 'D', gammas)
+        payoffs_quantum = sweep_payoffs('Q', 'D', gammas)
+    elif not use_aer:
+        payoffs_classical, _ = expected_payoffs(sample_counts_batch('D', 'D', gammas, shots), shots)
+        payoffs_quantum, _ = expected_payoffs(sample_counts_batch('Q', 'D', gammas, shots), shots)
+    else:
+        # Interleaved D vs D / Q vs D circuits, submitted as a single job
+        matchups = [(sA, 'D', g) for g in gammas for sA in ('D', 'Q')]
+        counts = run_batch(matchups, shots)
+
+        payoffs_classical = [expected_payoffs(c, shots)[0] for c in counts[0::2]]
+        payoffs_quantum = [expected_payoffs(c, shots)[0] for c in counts[1::2]]
         
     plt.figure(figsize=(10,6))
     plt.plot(gammas, payoffs_classical, 'r--', label='D vs D (Classical)')
@@ -118,11 +56,11 @@ def experiment_2_equilibrium_check():
     print(f"{'Alice \\ Bob':<12} | {'C':^8} | {'D':^8} | {'Q':^8} |")
     print("-" * 50)
     
-    for sA in strategies:
+    payoffs, _ = expected_payoffs(analytic_probs_table(gamma_max, strategies))
+    
+    for sA, row in zip(strategies, payoffs):
         row_string = f" {sA:<11} |"
-        for sB in strategies:
-            counts = run_ewl_circuit(sA, sB, gamma_max)
-            payoff = get_expected_payoff(counts, 4096)
+        for payoff in row:
             row_string += f" {payoff:^8.1f} |"
         print(row_string)
     print("-" * 50)